@@ -1,7 +1,9 @@
+import hashlib
 import json
 import os
 import uuid
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional, Literal
 
@@ -207,6 +209,228 @@ def normalize_addresses(addresses: Dict[str, Optional[str]]) -> Dict[str, Option
     return normalized
 
 
+# ----- Receiving address validation -----
+BASE58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+BECH32_CHARSET = "qpzry9x8gf2tvdw0s3jn54khce6mua7l"
+BECH32_CONST = 1
+BECH32M_CONST = 0x2BC830A3
+BTC_BASE58_VERSIONS = (0x00, 0x05)  # P2PKH, P2SH (mainnet)
+BTC_BECH32_HRP = "bc"
+BTC_BASE58_LENGTH = (25, 35)
+# Longest supported format (bech32); bounds work done and memory held by the cache
+MAX_ADDRESS_LENGTH = 90
+ADDRESS_CACHE_SIZE = 4096
+
+KECCAK_ROUND_CONSTANTS = [
+    0x0000000000000001, 0x0000000000008082, 0x800000000000808A, 0x8000000080008000,
+    0x000000000000808B, 0x0000000080000001, 0x8000000080008081, 0x8000000000008009,
+    0x000000000000008A, 0x0000000000000088, 0x0000000080008009, 0x000000008000000A,
+    0x000000008000808B, 0x800000000000008B, 0x8000000000008089, 0x8000000000008003,
+    0x8000000000008002, 0x8000000000000080, 0x000000000000800A, 0x800000008000000A,
+    0x8000000080008081, 0x8000000000008080, 0x0000000080000001, 0x8000000080008008,
+]
+# Rotation offsets indexed as [x][y]
+KECCAK_ROTATIONS = [
+    [0, 36, 3, 41, 18],
+    [1, 44, 10, 45, 2],
+    [62, 6, 43, 15, 61],
+    [28, 55, 25, 21, 56],
+    [27, 20, 39, 8, 14],
+]
+MASK_64 = (1 << 64) - 1
+
+
+def _rotl64(value: int, shift: int) -> int:
+    return ((value << shift) | (value >> (64 - shift))) & MASK_64 if shift else value
+
+
+def _keccak_f1600(lanes: List[int]) -> List[int]:
+    for rc in KECCAK_ROUND_CONSTANTS:
+        # theta
+        c = [lanes[x] ^ lanes[x + 5] ^ lanes[x + 10] ^ lanes[x + 15] ^ lanes[x + 20] for x in range(5)]
+        d = [c[(x - 1) % 5] ^ _rotl64(c[(x + 1) % 5], 1) for x in range(5)]
+        lanes = [lanes[i] ^ d[i % 5] for i in range(25)]
+        # rho + pi
+        b = [0] * 25
+        for x in range(5):
+            for y in range(5):
+                b[y + 5 * ((2 * x + 3 * y) % 5)] = _rotl64(lanes[x + 5 * y], KECCAK_ROTATIONS[x][y])
+        # chi
+        lanes = [
+            b[i] ^ (~b[(i % 5 + 1) % 5 + 5 * (i // 5)] & b[(i % 5 + 2) % 5 + 5 * (i // 5)])
+            for i in range(25)
+        ]
+        # iota
+        lanes[0] ^= rc
+    return lanes
+
+
+def keccak256(data: bytes) -> bytes:
+    """Original Keccak-256 as used by Ethereum (not NIST SHA3-256)."""
+
+    rate = 136
+    padded = bytearray(data)
+    padded.append(0x01)
+    padded.extend(b"\x00" * (-len(padded) % rate))
+    padded[-1] |= 0x80
+
+    lanes = [0] * 25
+    for offset in range(0, len(padded), rate):
+        block = padded[offset:offset + rate]
+        for i in range(rate // 8):
+            lanes[i] ^= int.from_bytes(block[i * 8:(i + 1) * 8], "little")
+        lanes = _keccak_f1600(lanes)
+    return b"".join(lane.to_bytes(8, "little") for lane in lanes[:4])
+
+
+def _base58check_decode(value: str) -> Optional[bytes]:
+    num = 0
+    for char in value:
+        idx = BASE58_ALPHABET.find(char)
+        if idx < 0:
+            return None
+        num = num * 58 + idx
+    leading_zeros = len(value) - len(value.lstrip("1"))
+    body = num.to_bytes((num.bit_length() + 7) // 8, "big") if num else b""
+    raw = b"\x00" * leading_zeros + body
+    if len(raw) < 5:
+        return None
+    payload, checksum = raw[:-4], raw[-4:]
+    if hashlib.sha256(hashlib.sha256(payload).digest()).digest()[:4] != checksum:
+        return None
+    return payload
+
+
+def _bech32_polymod(values: List[int]) -> int:
+    generator = [0x3B6A57B2, 0x26508E6D, 0x1EA119FA, 0x3D4233DD, 0x2A1462B3]
+    chk = 1
+    for value in values:
+        top = chk >> 25
+        chk = (chk & 0x1FFFFFF) << 5 ^ value
+        for i in range(5):
+            chk ^= generator[i] if ((top >> i) & 1) else 0
+    return chk
+
+
+def _convert_bits(data: List[int], from_bits: int, to_bits: int) -> Optional[List[int]]:
+    acc = 0
+    bits = 0
+    out: List[int] = []
+    maxv = (1 << to_bits) - 1
+    for value in data:
+        acc = (acc << from_bits) | value
+        bits += from_bits
+        while bits >= to_bits:
+            bits -= to_bits
+            out.append((acc >> bits) & maxv)
+    if bits >= from_bits or ((acc << (to_bits - bits)) & maxv):
+        return None
+    return out
+
+
+def _is_valid_btc_segwit(value: str) -> bool:
+    # Mixed case is never valid bech32
+    if value.lower() != value and value.upper() != value:
+        return False
+    value = value.lower()
+    sep = value.rfind("1")
+    if value[:sep] != BTC_BECH32_HRP or len(value) > 90 or len(value) - sep - 1 < 6:
+        return False
+    data = [BECH32_CHARSET.find(c) for c in value[sep + 1:]]
+    if any(d < 0 for d in data):
+        return False
+    hrp_expanded = [ord(c) >> 5 for c in BTC_BECH32_HRP] + [0] + [ord(c) & 31 for c in BTC_BECH32_HRP]
+    const = _bech32_polymod(hrp_expanded + data)
+    witness_version = data[0]
+    # BIP-173 for v0, BIP-350 (bech32m) for v1+
+    expected_const = BECH32_CONST if witness_version == 0 else BECH32M_CONST
+    if const != expected_const or witness_version > 16:
+        return False
+    program = _convert_bits(data[1:-6], 5, 8)
+    if program is None or not 2 <= len(program) <= 40:
+        return False
+    if witness_version == 0 and len(program) not in (20, 32):
+        return False
+    return True
+
+
+def _is_valid_btc_address(value: str) -> bool:
+    if value[:3].lower() == BTC_BECH32_HRP + "1":
+        return _is_valid_btc_segwit(value)
+    min_len, max_len = BTC_BASE58_LENGTH
+    if not min_len <= len(value) <= max_len:
+        return False
+    payload = _base58check_decode(value)
+    return payload is not None and len(payload) == 21 and payload[0] in BTC_BASE58_VERSIONS
+
+
+def _is_valid_evm_address(value: str) -> bool:
+    if len(value) != 42 or not value.startswith("0x"):
+        return False
+    body = value[2:]
+    if any(c not in "0123456789abcdefABCDEF" for c in body):
+        return False
+    # All-lowercase / all-uppercase addresses carry no EIP-55 checksum
+    if body == body.lower() or body == body.upper():
+        return True
+    digest = keccak256(body.lower().encode("ascii")).hex()
+    for char, nibble in zip(body, digest):
+        if char.isalpha() and char.isupper() != (int(nibble, 16) >= 8):
+            return False
+    return True
+
+
+ADDRESS_VALIDATORS = {
+    "BTC": _is_valid_btc_address,
+    "ETH": _is_valid_evm_address,
+    # ERC-20 stablecoins share the Ethereum address format
+    "USDT": _is_valid_evm_address,
+    "USDC": _is_valid_evm_address,
+}
+
+
+@lru_cache(maxsize=ADDRESS_CACHE_SIZE)
+def _checksum_address(symbol: str, address: str) -> bool:
+    validator = ADDRESS_VALIDATORS.get(symbol)
+    if validator is None:
+        return False
+    return validator(address)
+
+
+def is_valid_address(symbol: str, address: str) -> bool:
+    """Checksum-verify an address for the given crypto symbol (LRU cached).
+
+    Oversized input is rejected before it can reach the cache.
+    """
+
+    if len(address) > MAX_ADDRESS_LENGTH:
+        return False
+    return _checksum_address(symbol, address)
+
+
+def invalid_addresses(addresses: Dict[str, Optional[str]]) -> List[str]:
+    """Return the symbols whose (non-empty) address fails validation."""
+
+    return [
+        sym
+        for sym, addr in addresses.items()
+        if isinstance(addr, str) and addr.strip() and not is_valid_address(sym, addr.strip())
+    ]
+
+
+def preflight_addresses(symbol: str, entries: List[dict]) -> List[dict]:
+    """Validate all addresses of a payroll batch before calling the broker.
+
+    Returns the offending entries.
+    """
+
+    return [
+        entry
+        for entry in entries
+        if entry.get("address") and not is_valid_address(symbol, entry["address"])
+    ]
+
+
 # Load on startup
 load_employees_from_disk()
 
@@ -288,7 +512,10 @@ def get_company():
 @app.put("/company", response_model=CompanySettings)
 def update_company(settings: CompanySettings):
     # sanitize wallets keys
-    wallet_map = {s: settings.company_wallets.get(s) for s in SUPPORTED_CRYPTOS}
+    wallet_map = normalize_addresses(settings.company_wallets)
+    bad_syms = invalid_addresses(wallet_map)
+    if bad_syms:
+        raise HTTPException(status_code=400, detail=f"Invalid company wallet for: {', '.join(bad_syms)}")
     # banking info as plain dict
     banking = settings.banking.model_dump() if hasattr(settings, "banking") and settings.banking else {}
     # integrations info as plain dict
@@ -324,6 +551,9 @@ def upsert_employee(payload: EmployeeIn):
         if total != 100:
             raise HTTPException(status_code=400, detail="crypto_split for provided addresses must sum to 100")
     normalized_addresses = normalize_addresses(payload.receiving_addresses)
+    bad_syms = invalid_addresses(normalized_addresses)
+    if bad_syms:
+        raise HTTPException(status_code=400, detail=f"Invalid receiving address for: {', '.join(bad_syms)}")
     normalized_split = {s: int(payload.crypto_split.get(s, 0) or 0) for s in SUPPORTED_CRYPTOS}
     emp = EMPLOYEES.get(payload.user_id)
     if emp is None:
@@ -448,11 +678,6 @@ async def run_payroll(req: RunPayrollRequest):
     if req.crypto_symbol not in SUPPORTED_CRYPTOS:
         raise HTTPException(status_code=400, detail="Unsupported crypto symbol")
 
-    prices = await fetch_prices(COMPANY_SETTINGS.get("base_fiat", "CAD"))
-    price = prices.get(req.crypto_symbol)
-    if not price:
-        raise HTTPException(status_code=502, detail="Price not available")
-
     custody_mode = bool(COMPANY_SETTINGS.get("custody"))
     company_wallet = COMPANY_SETTINGS.get("company_wallets", {}).get(req.crypto_symbol)
 
@@ -487,7 +712,6 @@ async def run_payroll(req: RunPayrollRequest):
         }
         if not custody_mode:
             benefit_entry["address"] = company_wallet
-        benefit_entry["crypto_amount"] = round(benefit_entry["fiat_amount"] / price, 12)
         per_employee_breakdown.append(benefit_entry)
 
     if not per_employee_breakdown:
@@ -503,6 +727,21 @@ async def run_payroll(req: RunPayrollRequest):
             detail = "No eligible employee requests with valid addresses"
         raise HTTPException(status_code=400, detail=detail)
 
+    # Addresses do not depend on the price: reject a bad batch before any external call
+    if custody_mode:
+        preflight_entries = [{"user_id": "__company__", "address": company_wallet}]
+    else:
+        preflight_entries = per_employee_breakdown
+    failures = preflight_addresses(req.crypto_symbol, preflight_entries)
+    if failures:
+        offenders = ", ".join(str(item.get("user_id")) for item in failures)
+        raise HTTPException(status_code=400, detail=f"Invalid {req.crypto_symbol} address for: {offenders}")
+
+    prices = await fetch_prices(COMPANY_SETTINGS.get("base_fiat", "CAD"))
+    price = prices.get(req.crypto_symbol)
+    if not price:
+        raise HTTPException(status_code=502, detail="Price not available")
+
     for item in per_employee_breakdown:
         item["crypto_amount"] = round(item["fiat_amount"] / price, 12)
 
@@ -0,0 +1,125 @@
+import pytest
+
+from main import (
+    _checksum_address,
+    invalid_addresses,
+    is_valid_address,
+    keccak256,
+    preflight_addresses,
+)
+
+
+@pytest.mark.parametrize(
+    "data, expected",
+    [
+        (b"", "c5d2460186f7233c927e7db2dcc703c0e500b653ca82273b7bfad8045d85a470"),
+        (
+            b"The quick brown fox jumps over the lazy dog",
+            "4d741b6f1eb29cb2a9b9911c82f56fa8d73b04959d3d9d222895df6c0b28aa15",
+        ),
+        # Exactly one rate block, then more than one (rate is 136 bytes)
+        (b"a" * 136, "a6c4d403279fe3e0af03729caada8374b5ca54d8065329a3ebcaeb4b60aa386e"),
+        (b"a" * 200, "96ea54061def936c4be90b518992fdc6f12f535068a256229aca54267b4d084d"),
+    ],
+)
+def test_keccak256_known_answers(data, expected):
+    assert keccak256(data).hex() == expected
+
+
+@pytest.mark.parametrize(
+    "address",
+    [
+        # EIP-55 specification examples
+        "0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed",
+        "0xfB6916095ca1df60bB79Ce92cE3Ea74c37c5d359",
+        "0xdbF03B407c01E7cD3CBea99509d93f8DDDC8C6FB",
+        "0xD1220A0cf47c7B9Be7A2E6BA89F429762e7b9aDb",
+        # Single-case addresses carry no checksum
+        "0xfb6916095ca1df60bb79ce92ce3ea74c37c5d359",
+        "0xFB6916095CA1DF60BB79CE92CE3EA74C37C5D359",
+    ],
+)
+@pytest.mark.parametrize("symbol", ["ETH", "USDT", "USDC"])
+def test_evm_valid(symbol, address):
+    assert is_valid_address(symbol, address)
+
+
+@pytest.mark.parametrize(
+    "address",
+    [
+        "0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAeD",  # last char case flipped
+        "0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAe",
+        "5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed00",
+        "0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAeg",
+    ],
+)
+def test_evm_invalid(address):
+    assert not is_valid_address("ETH", address)
+
+
+@pytest.mark.parametrize(
+    "address",
+    [
+        # Base58check P2PKH / P2SH
+        "1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNa",
+        "3J98t1WpEZ73CNmQviecrnyiWrnqRhWNLy",
+        # BIP-173 (bech32, witness v0)
+        "BC1QW508D6QEJXTDG4Y5R3ZARVARY0C5XW7KV8F3T4",
+        "bc1qrp33g0q5c5txsp9arysrx4k6zdkfs4nce4xj0gdcccefvpysxf3qccfmv3",
+        # BIP-350 (bech32m, witness v1+)
+        "bc1pw508d6qejxtdg4y5r3zarvary0c5xw7kw508d6qejxtdg4y5r3zarvary0c5xw7kt5nd6y",
+        "bc1p0xlxvlhemja6c4dqv22uapctqupfhlxm9h8z3k2e72q4k9hcz7vqzk5jj0",
+    ],
+)
+def test_btc_valid(address):
+    assert is_valid_address("BTC", address)
+
+
+@pytest.mark.parametrize(
+    "address",
+    [
+        "1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNb",  # bad base58 checksum
+        "1A1zP1eP5QGefi2DMPTfTL5SLmv7Divf0a",  # '0' is not in the base58 alphabet
+        "bc1qw508d6qejxtdg4y5r3zarvary0c5xw7kv8f3t5",  # bad bech32 checksum
+        "bc1qw508d6qejxtdg4y5r3zarvary0c5xw7kV8f3t4",  # mixed case
+        "bc1qw508d6qejxtdg4y5r3zarvary0c5xw7kemeawh",  # v0 with bech32m checksum
+        "bc1pw508d6qejxtdg4y5r3zarvary0c5xw7kw508d6qejxtdg4y5r3zarvary0c5xw7k7grplx",  # v1 with bech32
+        "BC1QR508D6QEJXTDG4Y5R3ZARVARYV98GJ9P",  # invalid v0 program length
+        "tb1qw508d6qejxtdg4y5r3zarvary0c5xw7kxpjzsx",  # testnet hrp
+    ],
+)
+def test_btc_invalid(address):
+    assert not is_valid_address("BTC", address)
+
+
+def test_unsupported_symbol_is_invalid():
+    assert not is_valid_address("DOGE", "1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNa")
+
+
+def test_invalid_addresses_skips_empty_values():
+    addresses = {"BTC": "1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNb", "ETH": None, "USDT": "", "USDC": None}
+    assert invalid_addresses(addresses) == ["BTC"]
+
+
+def test_preflight_returns_offending_entries():
+    good = {"user_id": "a", "address": "1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNa"}
+    bad = {"user_id": "b", "address": "1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNb"}
+    assert preflight_addresses("BTC", [good, bad, {"user_id": "c"}]) == [bad]
+
+
+def test_base58_outside_length_range_is_invalid():
+    assert not is_valid_address("BTC", "1" * 36)
+    assert not is_valid_address("BTC", "1" * 24)
+
+
+@pytest.mark.parametrize(
+    "symbol, address",
+    [
+        ("BTC", "1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNa" * 6000),
+        ("ETH", "0x" + "a" * 200_000),
+    ],
+)
+def test_oversized_address_never_reaches_cache(symbol, address):
+    cached_before = _checksum_address.cache_info().currsize
+    assert invalid_addresses({symbol: address}) == [symbol]
+    assert _checksum_address.cache_info().currsize == cached_before
@@ -0,0 +1,133 @@
+import copy
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from main import Employee, app
+
+VALID_BTC = "1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNa"
+VALID_BTC_2 = "3J98t1WpEZ73CNmQviecrnyiWrnqRhWNLy"
+BAD_BTC = "1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNb"
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "EMPLOYEES", {})
+    monkeypatch.setattr(main, "TRANSACTIONS", [])
+    monkeypatch.setattr(main, "COMPANY_SETTINGS", copy.deepcopy(main.COMPANY_SETTINGS))
+    monkeypatch.setattr(main, "EMPLOYEES_DB_PATH", tmp_path / "employees.json")
+    return TestClient(app)
+
+
+@pytest.fixture
+def fetch_prices(monkeypatch):
+    stub = AsyncMock(return_value={"BTC": 100000.0, "ETH": 5000.0, "USDT": 1.4, "USDC": 1.4})
+    monkeypatch.setattr(main, "fetch_prices", stub)
+    return stub
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    stub = AsyncMock(return_value="0x" + "ab" * 30)
+    monkeypatch.setattr(main, "mock_third_party_buy_and_distribute", stub)
+    return stub
+
+
+def add_employee(user_id: str, btc_address: str) -> None:
+    # Written straight to the store, as if loaded from disk before validation existed
+    main.EMPLOYEES[user_id] = Employee(
+        user_id=user_id,
+        percent_to_crypto=10,
+        net_salary=2000.0,
+        receiving_addresses={"BTC": btc_address, "ETH": None, "USDT": None, "USDC": None},
+        crypto_split={"BTC": 100, "ETH": 0, "USDT": 0, "USDC": 0},
+    )
+
+
+def test_run_payroll_rejects_bad_employee_address(client, fetch_prices, broker):
+    add_employee("alice", VALID_BTC)
+    add_employee("bob", BAD_BTC)
+
+    r = client.post("/run-payroll", json={"payroll_fiat_total": 0, "crypto_symbol": "BTC"})
+
+    assert r.status_code == 400
+    assert "bob" in r.json()["detail"]
+    assert "alice" not in r.json()["detail"]
+    fetch_prices.assert_not_awaited()
+    broker.assert_not_awaited()
+    assert main.TRANSACTIONS == []
+
+
+def test_run_payroll_custody_checks_only_company_wallet(client, fetch_prices, broker):
+    main.COMPANY_SETTINGS["custody"] = True
+    main.COMPANY_SETTINGS["company_wallets"]["BTC"] = VALID_BTC_2
+    add_employee("bob", BAD_BTC)
+
+    r = client.post("/run-payroll", json={"payroll_fiat_total": 0, "crypto_symbol": "BTC"})
+
+    assert r.status_code == 200
+    broker.assert_awaited_once()
+    assert broker.await_args.kwargs["addresses"] == [VALID_BTC_2]
+
+
+def test_run_payroll_custody_rejects_bad_company_wallet(client, fetch_prices, broker):
+    main.COMPANY_SETTINGS["custody"] = True
+    main.COMPANY_SETTINGS["company_wallets"]["BTC"] = BAD_BTC
+    add_employee("alice", VALID_BTC)
+
+    r = client.post("/run-payroll", json={"payroll_fiat_total": 0, "crypto_symbol": "BTC"})
+
+    assert r.status_code == 400
+    assert "__company__" in r.json()["detail"]
+    broker.assert_not_awaited()
+
+
+def test_run_payroll_rejects_bad_company_benefit_wallet(client, fetch_prices, broker):
+    main.COMPANY_SETTINGS["custody"] = False
+    main.COMPANY_SETTINGS["company_benefit_amount"] = 50.0
+    main.COMPANY_SETTINGS["company_wallets"]["BTC"] = BAD_BTC
+    add_employee("alice", VALID_BTC)
+
+    r = client.post("/run-payroll", json={"payroll_fiat_total": 0, "crypto_symbol": "BTC"})
+
+    assert r.status_code == 400
+    assert "__company__" in r.json()["detail"]
+    broker.assert_not_awaited()
+
+
+def test_upsert_employee_rejects_bad_address(client):
+    payload = {
+        "user_id": "bob",
+        "percent_to_crypto": 10,
+        "receiving_addresses": {"BTC": BAD_BTC},
+        "crypto_split": {"BTC": 100},
+    }
+
+    r = client.post("/employees", json=payload)
+
+    assert r.status_code == 400
+    assert "BTC" in r.json()["detail"]
+    assert main.EMPLOYEES == {}
+    assert not main.EMPLOYEES_DB_PATH.exists()
+
+
+def test_update_company_rejects_bad_wallet(client):
+    before = copy.deepcopy(main.COMPANY_SETTINGS)
+    payload = {**before, "custody": True, "company_wallets": {"BTC": BAD_BTC, "ETH": "", "USDT": "", "USDC": ""}}
+
+    r = client.put("/company", json=payload)
+
+    assert r.status_code == 400
+    assert "BTC" in r.json()["detail"]
+    assert main.COMPANY_SETTINGS == before
+
+
+def test_update_company_strips_wallets(client):
+    payload = {**main.COMPANY_SETTINGS, "company_wallets": {"BTC": f"  {VALID_BTC} ", "ETH": "", "USDT": "", "USDC": ""}}
+
+    r = client.put("/company", json=payload)
+
+    assert r.status_code == 200
+    assert r.json()["company_wallets"]["BTC"] == VALID_BTC
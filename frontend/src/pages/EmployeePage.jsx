@@ -165,7 +165,15 @@ export default function EmployeePage() {
       receiving_addresses: addresses,
       crypto_split: cryptoSplit,
     }
-    await upsertEmployee(payload)
+    try {
+      await upsertEmployee(payload)
+    } catch (e) {
+      console.error('Save profile failed', e)
+      const msg = e?.response?.data?.detail || e?.message || 'Failed to save profile'
+      setAddressesSaved(false)
+      alert(msg)
+      return
+    }
     const list = await listEmployees()
     setEmployees(list)
     if (mode === 'new' && !list.find(e => e.user_id === userId)) {
@@ -40,9 +40,16 @@ export default function SettingsPage() {
 
   const saveSettings = async () => {
     setSaving(true)
-    const data = await updateCompany(company)
-    setCompany(data)
-    setSaving(false)
+    try {
+      const data = await updateCompany(company)
+      setCompany(data)
+    } catch (e) {
+      console.error('Save settings failed', e)
+      const msg = e?.response?.data?.detail || e?.message || 'Failed to save settings'
+      alert(msg)
+    } finally {
+      setSaving(false)
+    }
   }
 
   return (